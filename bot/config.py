@@ -2,11 +2,15 @@ from __future__ import annotations
 
 import os
 from dataclasses import dataclass, field
+from decimal import Decimal
+from functools import lru_cache
 from pathlib import Path
 from typing import Literal
 
 from dotenv import load_dotenv
 
+from bot.strategy.dislocation import build_ladder
+
 load_dotenv()
 
 
@@ -30,6 +34,15 @@ class LevelThresholds:
     buy_allocations: dict[str, float] = field(
         default_factory=lambda: {"L1": 0.20, "L2": 0.30, "L3": 0.30, "L4": 0.20}
     )
+    # (level, bit, threshold) entries in scan order, frozen once so the
+    # strategy does not re-walk the dicts every cycle. Buys scan
+    # deepest-first, sells scan the nearest step first.
+    buy_ladder: tuple[tuple[str, int, float], ...] = field(init=False, repr=False)
+    sell_ladder: tuple[tuple[str, int, float], ...] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.buy_ladder = build_ladder(self.buy)
+        self.sell_ladder = build_ladder(self.sell)
 
 
 @dataclass
@@ -53,9 +66,50 @@ class Settings:
     sell_price_ticks_offset: int = 0
     balance_refresh_every: int = 5
     thresholds: LevelThresholds = field(default_factory=LevelThresholds)
+    # Derived from tick_size/step_size: decimal places used to format orders
+    # and integer reciprocals used to floor prices/quantities onto the grid.
+    price_decimals: int = field(init=False)
+    qty_decimals: int = field(init=False)
+    tick_inv: int = field(init=False)
+    step_inv: int = field(init=False)
+
+    def __post_init__(self) -> None:
+        self._derive_precision()
+
+    def _derive_precision(self) -> None:
+        self.price_decimals = _decimals(self.tick_size)
+        self.qty_decimals = _decimals(self.step_size)
+        self.tick_inv = _inverse(self.tick_size)
+        self.step_inv = _inverse(self.step_size)
+
+    def apply_exchange_info(self, info: dict[str, float]) -> None:
+        """Override tick/step/min-notional with non-zero exchange filters."""
+        if info.get("tick_size"):
+            self.tick_size = info["tick_size"]
+        if info.get("step_size"):
+            self.step_size = info["step_size"]
+        if info.get("min_notional"):
+            self.min_notional = info["min_notional"]
+        self._derive_precision()
+
+
+def _decimals(increment: float) -> int:
+    if increment <= 0:
+        return 8
+    # Count the digits of the increment itself: 0.25 needs 2 places, not 1.
+    return max(0, -Decimal(repr(increment)).normalize().as_tuple().exponent)
+
+
+def _inverse(increment: float) -> int:
+    if increment <= 0:
+        return 0
+    inv = round(1 / increment)
+    return inv if inv and abs(inv * increment - 1) < 1e-9 else 0
 
 
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
+    """Parse settings from the environment once per process."""
     return Settings(
         mode=os.getenv("MODE", "DRY_RUN"),
         loop_seconds=int(os.getenv("LOOP_SECONDS", "30")),
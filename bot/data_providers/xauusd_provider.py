@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import importlib.util
+import time
 from dataclasses import dataclass
 
 try:
@@ -7,33 +9,83 @@ try:
 except Exception:  # noqa: BLE001
     httpx = None
 
+_HTTP2 = importlib.util.find_spec("h2") is not None
+
 
 @dataclass
 class XauUsdQuote:
     price: float | None
     unavailable_reason: str | None = None
+    # Set when the last good price is re-served after a transient failure.
+    stale: bool = False
 
 
 class XauUsdProvider:
-    """Expected JSON payload: {"price": float, "timestamp": "ISO-8601"}."""
+    """Expected JSON payload: {"price": float, "timestamp": "ISO-8601"}.
+
+    The last good quote is reused when the upstream answers ``304 Not
+    Modified`` to its ETag. A transient failure (5xx / transport error)
+    within ``max_stale_seconds`` of the last successful fetch re-serves its
+    price marked ``stale``.
+    """
 
-    def __init__(self, base_url: str, api_key: str, timeout: float = 8.0):
+    def __init__(self, base_url: str, api_key: str, timeout: float = 8.0, max_stale_seconds: float = 2.0):
         self.base_url = base_url
         self.api_key = api_key
         self.timeout = timeout
+        self.max_stale_seconds = max_stale_seconds
+        self._last_quote: XauUsdQuote | None = None
+        self._last_ok = 0.0
+        self._etag: str | None = None
+        self._client = None
+        if httpx is not None:
+            headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+            self._client = httpx.Client(
+                http2=_HTTP2,
+                timeout=timeout,
+                limits=httpx.Limits(max_keepalive_connections=1, keepalive_expiry=120.0),
+                headers=headers,
+            )
+
+    def close(self) -> None:
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    def __enter__(self) -> XauUsdProvider:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
 
     def fetch(self) -> XauUsdQuote:
-        if httpx is None:
+        if self._client is None:
             return XauUsdQuote(price=None, unavailable_reason="httpx dependency missing")
         if not self.base_url:
             return XauUsdQuote(price=None, unavailable_reason="XAUUSD_API_URL missing")
-        headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+        headers = {"If-None-Match": self._etag} if self._etag and self._last_quote else None
         try:
-            with httpx.Client(timeout=self.timeout) as client:
-                r = client.get(self.base_url, headers=headers)
-                r.raise_for_status()
-                payload = r.json()
+            r = self._client.get(self.base_url, headers=headers)
+            if r.status_code == 304 and self._last_quote is not None:
+                self._last_ok = time.monotonic()
+                return self._last_quote
+            r.raise_for_status()
+            payload = r.json()
             price = float(payload["price"])
-            return XauUsdQuote(price=price)
         except Exception as exc:  # noqa: BLE001
+            if self._is_transient(exc) and time.monotonic() - self._last_ok <= self.max_stale_seconds:
+                return XauUsdQuote(price=self._last_quote.price, unavailable_reason=f"stale XAUUSD: {exc}", stale=True)
             return XauUsdQuote(price=None, unavailable_reason=f"XAUUSD unavailable: {exc}")
+        quote = XauUsdQuote(price=price)
+        self._last_quote = quote
+        self._last_ok = time.monotonic()
+        self._etag = r.headers.get("ETag")
+        return quote
+
+    def _is_transient(self, exc: Exception) -> bool:
+        if self._last_quote is None:
+            return False
+        if isinstance(exc, httpx.TransportError):
+            return True
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+        return status is not None and status >= 500
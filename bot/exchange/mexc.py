@@ -2,17 +2,23 @@ from __future__ import annotations
 
 import hashlib
 import hmac
+import importlib.util
 import math
 import time
 from dataclasses import dataclass
-from typing import Any
-from urllib.parse import urlencode
+from typing import TYPE_CHECKING, Any
 
 try:
     import httpx
 except Exception:  # noqa: BLE001
     httpx = None
 
+# HTTP/2 needs the optional ``h2`` package (``httpx[http2]``).
+_HTTP2 = importlib.util.find_spec("h2") is not None
+
+if TYPE_CHECKING:
+    from typing import Self
+
 
 class MexcAuthError(RuntimeError):
     """Authentication failed, trading must stop."""
@@ -37,26 +43,68 @@ def floor_to_tick(value: float, tick: float) -> float:
     return math.floor(value / tick) * tick
 
 
+# Absorbs float noise for values already on the grid (4.35 * 100 == 434.99999...).
+_GRID_EPSILON = 1e-6
+
+
+def floor_to_grid(value: float, increment: float, inverse: int) -> float:
+    """Floor onto an ``increment`` grid using its integer reciprocal when there is one.
+
+    ``inverse`` is ``round(1 / increment)`` (100 for a 0.01 tick) or 0 when the
+    increment is not the reciprocal of an integer.
+    """
+    if inverse:
+        return math.floor(value * inverse + _GRID_EPSILON) / inverse
+    return floor_to_step(value, increment)
+
+
 def _ensure_httpx() -> None:
     if httpx is None:
         raise RuntimeError("httpx is required for exchange calls")
 
 
-class MexcPublic:
+def _make_client(base_url: str, timeout: float, headers: dict[str, str] | None = None) -> Any:
+    return httpx.Client(
+        base_url=base_url,
+        http2=_HTTP2,
+        timeout=timeout,
+        limits=httpx.Limits(max_keepalive_connections=4, max_connections=8, keepalive_expiry=120.0),
+        headers=headers,
+    )
+
+
+class _HttpClientMixin:
+    """Owns one keep-alive ``httpx.Client`` for the lifetime of the wrapper."""
+
+    _client: Any
+
+    def close(self) -> None:
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+class MexcPublic(_HttpClientMixin):
     def __init__(self, base_url: str = "https://api.mexc.com", timeout: float = 10.0):
+        _ensure_httpx()
         self.base_url = base_url
         self.timeout = timeout
+        self._client = _make_client(base_url, timeout)
 
     def get_book_ticker(self, symbol: str) -> tuple[float, float]:
-        _ensure_httpx()
-        with httpx.Client(base_url=self.base_url, timeout=self.timeout) as client:
-            r = client.get("/api/v3/ticker/bookTicker", params={"symbol": symbol})
-            r.raise_for_status()
-            p = r.json()
+        r = self._client.get("/api/v3/ticker/bookTicker", params={"symbol": symbol})
+        r.raise_for_status()
+        p = r.json()
         return float(p["bidPrice"]), float(p["askPrice"])
 
 
-class MexcPrivate:
+class MexcPrivate(_HttpClientMixin):
     def __init__(
         self,
         api_key: str,
@@ -66,28 +114,33 @@ class MexcPrivate:
         recv_window: int = 5000,
         max_retries: int = 2,
     ):
+        _ensure_httpx()
         self.api_key = api_key
         self.api_secret = api_secret
         self.base_url = base_url
         self.timeout = timeout
         self.recv_window = recv_window
         self.max_retries = max_retries
+        # Key pads are derived once; each request signs a copy of this context.
+        self._hmac_proto = hmac.new(api_secret.encode(), digestmod=hashlib.sha256)
+        self._client = _make_client(base_url, timeout, headers={"X-MEXC-APIKEY": api_key})
 
     def _signed_request(self, method: str, path: str, params: dict[str, Any] | None = None) -> dict[str, Any]:
-        _ensure_httpx()
         params = params.copy() if params else {}
         params["timestamp"] = int(time.time() * 1000)
         params["recvWindow"] = self.recv_window
-        query = urlencode(params)
-        signature = hmac.new(self.api_secret.encode(), query.encode(), hashlib.sha256).hexdigest()
+        # Keys and values are symbols, enums, ids and numbers, all URL-safe
+        # ASCII, so the query is joined directly without percent-encoding.
+        query = "&".join(f"{k}={v}" for k, v in params.items())
+        mac = self._hmac_proto.copy()
+        mac.update(query.encode("ascii"))
+        signature = mac.hexdigest()
 
-        headers = {"X-MEXC-APIKEY": self.api_key}
         url = f"{path}?{query}&signature={signature}"
 
         for attempt in range(self.max_retries + 1):
             try:
-                with httpx.Client(base_url=self.base_url, timeout=self.timeout) as client:
-                    response = client.request(method, url, headers=headers)
+                response = self._client.request(method, url)
                 if response.status_code in (401, 403):
                     raise MexcAuthError(f"MEXC auth failed on {path}, status={response.status_code}")
                 if response.status_code == 429 and attempt < self.max_retries:
@@ -115,25 +168,33 @@ class MexcPrivate:
 
     def get_balances(self) -> tuple[float, float]:
         acc = self.get_account_info()
-        usdt = 0.0
-        xaut = 0.0
-        for b in acc.get("balances", []):
+        wanted = {"USDT", "XAUT"}
+        free = {"USDT": 0.0, "XAUT": 0.0}
+        for b in acc.get("balances", ()):
             asset = b.get("asset")
-            free = float(b.get("free", 0.0))
-            if asset == "USDT":
-                usdt = free
-            elif asset == "XAUT":
-                xaut = free
-        return usdt, xaut
-
-    def place_limit_order(self, symbol: str, side: str, price: float, quantity: float) -> str:
+            if asset in wanted:
+                free[asset] = float(b.get("free", 0.0))
+                wanted.discard(asset)
+                if not wanted:
+                    break
+        return free["USDT"], free["XAUT"]
+
+    def place_limit_order(
+        self,
+        symbol: str,
+        side: str,
+        price: float,
+        quantity: float,
+        price_decimals: int,
+        qty_decimals: int,
+    ) -> str:
         payload = {
             "symbol": symbol,
             "side": side,
             "type": "LIMIT",
             "timeInForce": "GTC",
-            "quantity": f"{quantity:.12f}".rstrip("0").rstrip("."),
-            "price": f"{price:.12f}".rstrip("0").rstrip("."),
+            "quantity": f"{quantity:.{qty_decimals}f}",
+            "price": f"{price:.{price_decimals}f}",
             "newOrderRespType": "RESULT",
         }
         data = self._signed_request("POST", "/api/v3/order", payload)
@@ -154,11 +215,9 @@ class MexcPrivate:
         )
 
     def get_exchange_info(self, symbol: str) -> dict[str, float]:
-        _ensure_httpx()
-        with httpx.Client(base_url=self.base_url, timeout=self.timeout) as client:
-            r = client.get("/api/v3/exchangeInfo", params={"symbol": symbol})
-            r.raise_for_status()
-            payload = r.json()
+        r = self._client.get("/api/v3/exchangeInfo", params={"symbol": symbol})
+        r.raise_for_status()
+        payload = r.json()
         info = {"tick_size": 0.0, "step_size": 0.0, "min_notional": 0.0}
         symbols = payload.get("symbols", [])
         if not symbols:
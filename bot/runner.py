@@ -1,19 +1,20 @@
 from __future__ import annotations
 
-import argparse
+import atexit
 import logging
+import sys
 import time
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 
 from rich.live import Live
 
 from bot.config import get_settings
 from bot.data_providers.xauusd_provider import XauUsdProvider
-from bot.exchange.mexc import MexcAuthError, MexcPrivate, MexcPublic, floor_to_step, floor_to_tick
-from bot.state import ActiveOrder, BotState, StateStore
+from bot.exchange.mexc import MexcAuthError, MexcPrivate, MexcPublic, floor_to_grid
+from bot.state import ActiveOrder, BotState, Side, StateStore, level_bit, now_ms
 from bot.strategy.dislocation import compute_deviation_pct, next_buy_level, next_sell_step, sell_qty
 from bot.strategy.risk import update_emergency_mode, update_xau_history
-from bot.ui.tui import build_layout
+from bot.ui.tui import LayoutCache, update_layout
 
 
 def setup_logging(path: str) -> None:
@@ -34,24 +35,35 @@ def setup_logging(path: str) -> None:
     logger.addHandler(fh)
 
 
+class _NullLive:
+    """Stand-in for ``rich.live.Live`` when stdout is not a terminal."""
+
+    def __enter__(self) -> _NullLive:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        return None
+
+    def update(self, renderable: object) -> None:
+        return None
+
+
 def refresh_balances_live(state: BotState, private_client: MexcPrivate) -> None:
     usdt, xaut = private_client.get_balances()
-    state.balances["USDT"] = usdt
-    state.balances["XAUT"] = xaut
+    state.balances.usdt = usdt
+    state.balances.xaut = xaut
 
 
-def apply_simulated_fill(state: BotState, side: str, qty: float, price: float, level: str) -> None:
-    if side == "BUY":
-        state.balances["USDT"] -= qty * price
-        state.balances["XAUT"] += qty
-        if level.startswith("L"):
-            state.filled_buy_levels[level] = True
+def apply_simulated_fill(state: BotState, side: Side, qty: float, price: float, level: str) -> None:
+    if side is Side.BUY:
+        state.balances.usdt -= qty * price
+        state.balances.xaut += qty
+        state.filled_buy_mask |= level_bit(level)
     else:
-        state.balances["XAUT"] -= qty
-        state.balances["USDT"] += qty * price
-        if level.startswith("S"):
-            state.filled_sell_steps[level] = True
-    state.add_event(f"SIMULATED {side} {level} filled qty={qty:.6f} price={price:.4f}")
+        state.balances.xaut -= qty
+        state.balances.usdt += qty * price
+        state.filled_sell_mask |= level_bit(level)
+    state.add_event(f"SIMULATED {side.value} {level} filled qty={qty:.6f} price={price:.4f}")
 
 
 def handle_active_order(
@@ -70,10 +82,10 @@ def handle_active_order(
     ao.filled_qty = status.filled_qty
 
     if status.status == "FILLED":
-        if ao.level.startswith("L"):
-            state.filled_buy_levels[ao.level] = True
-        elif ao.level.startswith("S"):
-            state.filled_sell_steps[ao.level] = True
+        if ao.side is Side.BUY:
+            state.filled_buy_mask |= level_bit(ao.level)
+        else:
+            state.filled_sell_mask |= level_bit(ao.level)
         refresh_balances_live(state, private_client)
         state.add_event(f"Order {ao.order_id} FILLED")
         state.active_order = None
@@ -88,8 +100,8 @@ def handle_active_order(
         state.active_order = None
         return
 
-    age_limit = ao.created_ts + timedelta(minutes=ttl_minutes)
-    if status.status == "NEW" and datetime.utcnow() > age_limit:
+    age_limit = ao.created_ts + ttl_minutes * 60_000
+    if status.status == "NEW" and now_ms() > age_limit:
         private_client.cancel_order(symbol, ao.order_id)
         state.add_event(f"Order {ao.order_id} canceled by TTL")
         state.active_order = None
@@ -98,22 +110,27 @@ def handle_active_order(
 def main() -> None:
     settings = get_settings()
 
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--mode", choices=["DRY_RUN", "LIVE"], default=settings.mode)
-    parser.add_argument("--loop-seconds", type=int, default=settings.loop_seconds)
-    parser.add_argument("--symbol", default=settings.symbol)
-    args = parser.parse_args()
+    if len(sys.argv) > 1:
+        import argparse
 
-    setup_logging(str(settings.log_path))
+        parser = argparse.ArgumentParser()
+        parser.add_argument("--mode", choices=["DRY_RUN", "LIVE"], default=settings.mode)
+        parser.add_argument("--loop-seconds", type=int, default=settings.loop_seconds)
+        parser.add_argument("--symbol", default=settings.symbol)
+        args = parser.parse_args()
+        mode, loop_seconds, symbol = args.mode, args.loop_seconds, args.symbol
+    else:
+        # No flags (e.g. run as a service): settings already hold the defaults.
+        mode, loop_seconds, symbol = settings.mode, settings.loop_seconds, settings.symbol
 
-    mode = args.mode
-    loop_seconds = args.loop_seconds
-    symbol = args.symbol
+    setup_logging(str(settings.log_path))
 
     state_store = StateStore(settings.state_path)
     state = state_store.load()
+    atexit.register(state_store.close)
 
     public_client = MexcPublic(settings.mexc_base_url)
+    atexit.register(public_client.close)
     private_client = None
     warnings: list[str] = []
 
@@ -127,53 +144,63 @@ def main() -> None:
                 api_secret=settings.mexc_api_secret,
                 base_url=settings.mexc_base_url,
             )
+            atexit.register(private_client.close)
             try:
                 private_client.auth_test()
                 refresh_balances_live(state, private_client)
                 try:
-                    exch = private_client.get_exchange_info(symbol)
-                    if exch.get("tick_size"):
-                        settings.tick_size = exch["tick_size"]
-                    if exch.get("step_size"):
-                        settings.step_size = exch["step_size"]
-                    if exch.get("min_notional"):
-                        settings.min_notional = exch["min_notional"]
+                    settings.apply_exchange_info(private_client.get_exchange_info(symbol))
                 except Exception:  # noqa: BLE001
                     pass
             except MexcAuthError as exc:
                 warnings.append(f"LIVE disabled auth error: {exc}")
                 state.add_event(str(exc))
                 mode = "DRY_RUN"
+                private_client.close()
                 private_client = None
 
-    if state.balances["USDT"] == 0 and mode == "DRY_RUN":
-        state.balances["USDT"] = 1000.0
-
-    xau_provider = XauUsdProvider(settings.xauusd_api_url, settings.xauusd_api_key)
+    if state.balances.usdt == 0 and mode == "DRY_RUN":
+        state.balances.usdt = 1000.0
+
+    # Tolerate one failed poll by re-serving the previous quote.
+    xau_provider = XauUsdProvider(
+        settings.xauusd_api_url, settings.xauusd_api_key, max_stale_seconds=loop_seconds * 1.5
+    )
+    atexit.register(xau_provider.close)
+    # The XAUUSD provider and MEXC are independent hosts: fetch the fair
+    # price in the background while the order book is read on this thread.
+    fetch_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="xauusd-fetch")
+    atexit.register(fetch_pool.shutdown, wait=False)
     cycles = 0
+    # Without a terminal there is nothing to draw: skip building the TUI at all.
+    interactive = sys.stdout.isatty()
+    live_ctx = Live(refresh_per_second=2, screen=True) if interactive else _NullLive()
+    layout_cache = LayoutCache(settings.timezone, loop_seconds) if interactive else None
 
-    with Live(refresh_per_second=2, screen=True) as live:
+    with live_ctx as live:
         while True:
             cycles += 1
             warnings_cycle = warnings.copy()
             bid = ask = fair = deviation = None
 
             try:
+                xau_future = fetch_pool.submit(xau_provider.fetch)
                 bid, ask = public_client.get_book_ticker(symbol)
-                xau_quote = xau_provider.fetch()
+                xau_quote = xau_future.result()
                 if xau_quote.price is None:
                     warnings_cycle.append(xau_quote.unavailable_reason or "XAUUSD unavailable")
                     state.add_event(xau_quote.unavailable_reason or "XAUUSD unavailable")
                     state_store.save(state)
-                    live.update(
-                        build_layout(state, mode, loop_seconds, settings.timezone, None, bid, ask, None, warnings_cycle)
-                    )
+                    if layout_cache is not None:
+                        live.update(update_layout(layout_cache, state, mode, None, bid, ask, None, warnings_cycle))
                     time.sleep(loop_seconds)
                     continue
 
                 fair = xau_quote.price
-                now = datetime.utcnow()
-                update_xau_history(state, fair, now)
+                if xau_quote.stale:
+                    warnings_cycle.append(xau_quote.unavailable_reason or "stale XAUUSD")
+                    state.add_event(f"Trading on stale XAUUSD {fair:.4f}: {xau_quote.unavailable_reason}")
+                update_xau_history(state, fair, now_ms())
                 deviation = compute_deviation_pct(bid, ask, fair)
                 update_emergency_mode(state, deviation)
 
@@ -183,52 +210,58 @@ def main() -> None:
                 handle_active_order(state, mode, symbol, private_client, settings.order_ttl_minutes)
 
                 if state.active_order is None and not state.emergency_mode.enabled:
-                    buy_level = next_buy_level(deviation, settings.thresholds.buy, state.filled_buy_levels)
-                    sell_step = next_sell_step(deviation, settings.thresholds.sell, state.filled_sell_steps)
+                    buy_level = next_buy_level(deviation, settings.thresholds.buy_ladder, state.filled_buy_mask)
+                    sell_step = next_sell_step(deviation, settings.thresholds.sell_ladder, state.filled_sell_mask)
 
                     if buy_level:
                         base_price = bid + settings.buy_price_ticks_offset * settings.tick_size
-                        limit_price = floor_to_tick(base_price, settings.tick_size)
-                        usdt_free = state.balances["USDT"]
+                        limit_price = floor_to_grid(base_price, settings.tick_size, settings.tick_inv)
+                        usdt_free = state.balances.usdt
                         buy_usdt = usdt_free * settings.thresholds.buy_allocations[buy_level]
-                        qty = floor_to_step(buy_usdt / limit_price, settings.step_size)
+                        qty = floor_to_grid(buy_usdt / limit_price, settings.step_size, settings.step_inv)
                         if limit_price * qty < settings.min_notional or qty <= 0:
                             warnings_cycle.append(f"BUY {buy_level} skipped: below min_notional")
                         else:
                             if mode == "DRY_RUN":
-                                apply_simulated_fill(state, "BUY", qty, limit_price, buy_level)
+                                apply_simulated_fill(state, Side.BUY, qty, limit_price, buy_level)
                             else:
                                 assert private_client is not None
-                                oid = private_client.place_limit_order(symbol, "BUY", limit_price, qty)
+                                oid = private_client.place_limit_order(
+                                    symbol, Side.BUY.value, limit_price, qty, settings.price_decimals, settings.qty_decimals
+                                )
                                 state.active_order = ActiveOrder(
                                     order_id=oid,
-                                    side="BUY",
+                                    side=Side.BUY,
                                     level=buy_level,
                                     price=limit_price,
                                     qty=qty,
-                                    created_ts=datetime.utcnow(),
+                                    created_ts=now_ms(),
                                 )
                                 state.add_event(f"BUY {buy_level} placed id={oid} qty={qty:.6f} @ {limit_price:.4f}")
 
-                    elif sell_step and state.balances["XAUT"] > 0:
+                    elif sell_step and state.balances.xaut > 0:
                         base_price = ask - settings.sell_price_ticks_offset * settings.tick_size
-                        limit_price = floor_to_tick(base_price, settings.tick_size)
-                        qty = floor_to_step(sell_qty(sell_step, state.balances["XAUT"]), settings.step_size)
+                        limit_price = floor_to_grid(base_price, settings.tick_size, settings.tick_inv)
+                        qty = floor_to_grid(
+                            sell_qty(sell_step, state.balances.xaut), settings.step_size, settings.step_inv
+                        )
                         if limit_price * qty < settings.min_notional or qty <= 0:
                             warnings_cycle.append(f"SELL {sell_step} skipped: below min_notional")
                         else:
                             if mode == "DRY_RUN":
-                                apply_simulated_fill(state, "SELL", qty, limit_price, sell_step)
+                                apply_simulated_fill(state, Side.SELL, qty, limit_price, sell_step)
                             else:
                                 assert private_client is not None
-                                oid = private_client.place_limit_order(symbol, "SELL", limit_price, qty)
+                                oid = private_client.place_limit_order(
+                                    symbol, Side.SELL.value, limit_price, qty, settings.price_decimals, settings.qty_decimals
+                                )
                                 state.active_order = ActiveOrder(
                                     order_id=oid,
-                                    side="SELL",
+                                    side=Side.SELL,
                                     level=sell_step,
                                     price=limit_price,
                                     qty=qty,
-                                    created_ts=datetime.utcnow(),
+                                    created_ts=now_ms(),
                                 )
                                 state.add_event(f"SELL {sell_step} placed id={oid} qty={qty:.6f} @ {limit_price:.4f}")
 
@@ -239,13 +272,17 @@ def main() -> None:
                 warnings_cycle.append(f"Trading blocked: {exc}")
                 state.add_event(f"MEXC auth error: {exc}")
                 mode = "DRY_RUN"
+                if private_client is not None:
+                    private_client.close()
                 private_client = None
             except Exception as exc:  # noqa: BLE001
                 warnings_cycle.append(str(exc))
                 state.add_event(f"Loop error: {exc}")
 
             state_store.save(state)
-            live.update(build_layout(state, mode, loop_seconds, settings.timezone, fair, bid, ask, deviation, warnings_cycle))
+            if layout_cache is not None:
+                # Each layout region re-renders only when its own inputs change.
+                live.update(update_layout(layout_cache, state, mode, fair, bid, ask, deviation, warnings_cycle))
             time.sleep(loop_seconds)
 
 
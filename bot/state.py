@@ -1,108 +1,270 @@
 from __future__ import annotations
 
+import hashlib
 import json
+import os
+import time
 from collections import deque
 from dataclasses import asdict, dataclass, field
-from datetime import datetime, timedelta
+from datetime import datetime, timezone
+from enum import Enum
 from pathlib import Path
-from typing import Literal
+from typing import BinaryIO
+
+try:
+    import orjson
+except Exception:  # noqa: BLE001
+    orjson = None
+
+
+MAX_EVENTS = 10
+BUY_LEVELS = ("L1", "L2", "L3", "L4")
+SELL_STEPS = ("S1", "S2", "S3")
+_LEVEL_BITS = {name: 1 << i for names in (BUY_LEVELS, SELL_STEPS) for i, name in enumerate(names)}
+HISTORY_WINDOW_MS = 24 * 60 * 60 * 1000
+
+
+def now_ms() -> int:
+    return time.time_ns() // 1_000_000
+
+
+def level_bit(level: str) -> int:
+    """Bit for a buy level or sell step within its fill mask."""
+    return _LEVEL_BITS[level]
+
+
+def _mask_to_dict(mask: int, names: tuple[str, ...]) -> dict[str, bool]:
+    return {name: bool(mask & level_bit(name)) for name in names}
+
+
+def _dict_to_mask(filled: dict[str, bool]) -> int:
+    mask = 0
+    for name, done in filled.items():
+        if done:
+            mask |= level_bit(name)
+    return mask
+
+
+class Side(str, Enum):
+    BUY = "BUY"
+    SELL = "SELL"
 
 
 @dataclass
 class ActiveOrder:
     order_id: str
-    side: Literal["BUY", "SELL"]
+    side: Side
     level: str
     price: float
     qty: float
-    created_ts: datetime
+    created_ts: int  # epoch ms
     status: str = "NEW"
     filled_qty: float = 0.0
 
+    def age_minutes(self, now: int) -> float:
+        return (now - self.created_ts) / 60_000
+
 
 @dataclass
-class EmergencyState:
-    enabled: bool = False
-    reason: str = ""
+class Balances:
+    xaut: float = 0.0
+    usdt: float = 0.0
+
+    def as_dict(self) -> dict[str, float]:
+        return {"XAUT": self.xaut, "USDT": self.usdt}
 
 
 @dataclass
-class XauHistoryPoint:
-    ts: datetime
-    price: float
+class EmergencyState:
+    enabled: bool = False
+    reason: str = ""
 
 
 @dataclass
 class BotState:
-    balances: dict[str, float] = field(default_factory=lambda: {"XAUT": 0.0, "USDT": 0.0})
-    filled_buy_levels: dict[str, bool] = field(
-        default_factory=lambda: {"L1": False, "L2": False, "L3": False, "L4": False}
-    )
-    filled_sell_steps: dict[str, bool] = field(
-        default_factory=lambda: {"S1": False, "S2": False, "S3": False}
-    )
+    balances: Balances = field(default_factory=Balances)
+    # Filled buy levels / sell steps as bitmasks, see level_bit().
+    filled_buy_mask: int = 0
+    filled_sell_mask: int = 0
     active_order: ActiveOrder | None = None
     emergency_mode: EmergencyState = field(default_factory=EmergencyState)
-    xauusd_history: list[XauHistoryPoint] = field(default_factory=list)
-    events: list[str] = field(default_factory=list)
+    # XAUUSD history as parallel columns: epoch-ms timestamps and prices.
+    xau_ts: deque[int] = field(default_factory=deque)
+    xau_px: deque[float] = field(default_factory=deque)
+    events: deque[str] = field(default_factory=lambda: deque(maxlen=MAX_EVENTS))
+    # Bumped on every add_event; identifies the events window even when the
+    # capped deque's length and newest entry repeat. Not persisted.
+    events_seq: int = 0
+
+    @property
+    def filled_buy_levels(self) -> dict[str, bool]:
+        return _mask_to_dict(self.filled_buy_mask, BUY_LEVELS)
+
+    @property
+    def filled_sell_steps(self) -> dict[str, bool]:
+        return _mask_to_dict(self.filled_sell_mask, SELL_STEPS)
 
     def add_event(self, event: str) -> None:
-        ring = deque(self.events, maxlen=10)
-        ring.append(f"{datetime.utcnow().isoformat()}Z | {event}")
-        self.events = list(ring)
+        self.events.append(f"{time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())} | {event}")
+        self.events_seq += 1
 
-    def prune_history(self, now: datetime) -> None:
-        cutoff = now - timedelta(hours=24)
-        self.xauusd_history = [p for p in self.xauusd_history if p.ts >= cutoff]
+    def prune_history(self, now: int) -> None:
+        cutoff = now - HISTORY_WINDOW_MS
+        ts, px = self.xau_ts, self.xau_px
+        while ts and ts[0] < cutoff:
+            ts.popleft()
+            px.popleft()
 
 
-def _to_datetime(v: str | datetime) -> datetime:
-    if isinstance(v, datetime):
-        return v
-    return datetime.fromisoformat(v.replace("Z", "+00:00")).replace(tzinfo=None)
+def _iso_to_ms(v: str) -> int:
+    """Convert a legacy naive-UTC ISO timestamp to epoch ms."""
+    dt = datetime.fromisoformat(v.replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp() * 1000)
 
 
 def _state_from_dict(data: dict) -> BotState:
     active = data.get("active_order")
     active_order = None
     if active:
-        active["created_ts"] = _to_datetime(active["created_ts"])
+        active["side"] = Side(active["side"])
+        if isinstance(active["created_ts"], str):
+            active["created_ts"] = _iso_to_ms(active["created_ts"])
         active_order = ActiveOrder(**active)
-    history = [XauHistoryPoint(ts=_to_datetime(p["ts"]), price=float(p["price"])) for p in data.get("xauusd_history", [])]
+    history = data.get("xauusd_history") or {"ts": [], "px": []}
+    if isinstance(history, list):
+        # Pre-columnar state files stored a list of {"ts": iso, "price": float}.
+        history = {
+            "ts": [_iso_to_ms(p["ts"]) for p in history],
+            "px": [p["price"] for p in history],
+        }
     em = EmergencyState(**data.get("emergency_mode", {}))
+    bal = data.get("balances", {})
     return BotState(
-        balances=data.get("balances", {"XAUT": 0.0, "USDT": 0.0}),
-        filled_buy_levels=data.get("filled_buy_levels", {"L1": False, "L2": False, "L3": False, "L4": False}),
-        filled_sell_steps=data.get("filled_sell_steps", {"S1": False, "S2": False, "S3": False}),
+        balances=Balances(xaut=float(bal.get("XAUT", 0.0)), usdt=float(bal.get("USDT", 0.0))),
+        filled_buy_mask=data.get("filled_buy_mask", _dict_to_mask(data.get("filled_buy_levels", {}))),
+        filled_sell_mask=data.get("filled_sell_mask", _dict_to_mask(data.get("filled_sell_steps", {}))),
         active_order=active_order,
         emergency_mode=em,
-        xauusd_history=history,
-        events=data.get("events", []),
+        xau_ts=deque(int(v) for v in history["ts"]),
+        xau_px=deque(float(v) for v in history["px"]),
+        events=deque(data.get("events", []), maxlen=MAX_EVENTS),
     )
 
 
 def _state_to_dict(state: BotState) -> dict:
-    data = asdict(state)
-    if state.active_order:
-        data["active_order"]["created_ts"] = state.active_order.created_ts.isoformat()
-    data["xauusd_history"] = [{"ts": p.ts.isoformat(), "price": p.price} for p in state.xauusd_history]
-    return data
+    """Hot snapshot: everything except the XAUUSD history, which StateStore appends separately."""
+    # Built by hand: asdict() would deep-copy every nested container.
+    ao = state.active_order
+    return {
+        "balances": state.balances.as_dict(),
+        "filled_buy_mask": state.filled_buy_mask,
+        "filled_sell_mask": state.filled_sell_mask,
+        "active_order": None if ao is None else asdict(ao),
+        "emergency_mode": {"enabled": state.emergency_mode.enabled, "reason": state.emergency_mode.reason},
+        "events": list(state.events),
+    }
+
+
+def _dumps(data: dict) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def _dumps_line(data: dict) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data) + b"\n"
+    return json.dumps(data, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def _loads(raw: bytes) -> dict:
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
 
 
 class StateStore:
+    """Persists the bot state as a small JSON snapshot plus an append-only history log.
+
+    ``state.json`` holds everything but the XAUUSD history and is rewritten
+    when it changes. History points are appended one line each to
+    ``<stem>.history.ndjson``; the log is compacted down to the 24h window on
+    load and whenever it grows to twice the retained history.
+    """
+
     def __init__(self, path: Path):
         self.path = path
+        self.history_path = path.with_suffix(".history.ndjson")
+        self._last_digest: bytes | None = None
+        self._history_fh: BinaryIO | None = None
+        self._history_tail: int | None = None
+        self._history_lines = 0
 
     def load(self) -> BotState:
-        if not self.path.exists():
-            return BotState()
-        with self.path.open("r", encoding="utf-8") as f:
-            data = json.load(f)
-        return _state_from_dict(data)
+        state = _state_from_dict(_loads(self.path.read_bytes())) if self.path.exists() else BotState()
+        if self.history_path.exists():
+            with self.history_path.open("rb") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        point = _loads(line)
+                    except ValueError:
+                        continue  # torn final line after a crash
+                    if state.xau_ts and point["ts"] <= state.xau_ts[-1]:
+                        continue
+                    state.xau_ts.append(int(point["ts"]))
+                    state.xau_px.append(float(point["px"]))
+        state.prune_history(now_ms())
+        self._compact_history(state)
+        return state
 
     def save(self, state: BotState) -> None:
+        self.save_hot(state)
+        ts, px = state.xau_ts, state.xau_px
+        new = 0
+        while new < len(ts) and (self._history_tail is None or ts[-1 - new] > self._history_tail):
+            new += 1
+        if new == 0:
+            return
+        if self._history_lines + new > 2 * len(ts):
+            self._compact_history(state)
+            return
+        for i in range(len(ts) - new, len(ts)):
+            self.append_history(ts[i], px[i])
+        assert self._history_fh is not None
+        self._history_fh.flush()
+
+    def save_hot(self, state: BotState) -> None:
+        data = _dumps(_state_to_dict(state))
+        digest = hashlib.blake2b(data, digest_size=16).digest()
+        if digest == self._last_digest:
+            return
         self.path.parent.mkdir(parents=True, exist_ok=True)
         tmp = self.path.with_suffix(".tmp")
-        with tmp.open("w", encoding="utf-8") as f:
-            json.dump(_state_to_dict(state), f, ensure_ascii=False, indent=2)
-        tmp.replace(self.path)
+        tmp.write_bytes(data)
+        os.replace(tmp, self.path)
+        self._last_digest = digest
+
+    def append_history(self, ts: int, price: float) -> None:
+        """Buffer one history line; ``save`` flushes once per call."""
+        if self._history_fh is None:
+            self.history_path.parent.mkdir(parents=True, exist_ok=True)
+            self._history_fh = self.history_path.open("ab")
+        self._history_fh.write(_dumps_line({"ts": ts, "px": price}))
+        self._history_tail = ts
+        self._history_lines += 1
+
+    def close(self) -> None:
+        if self._history_fh is not None:
+            self._history_fh.close()
+            self._history_fh = None
+
+    def _compact_history(self, state: BotState) -> None:
+        self.close()
+        self.history_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.history_path.with_suffix(".tmp")
+        tmp.write_bytes(b"".join(_dumps_line({"ts": t, "px": p}) for t, p in zip(state.xau_ts, state.xau_px)))
+        os.replace(tmp, self.history_path)
+        self._history_tail = state.xau_ts[-1] if state.xau_ts else None
+        self._history_lines = len(state.xau_ts)
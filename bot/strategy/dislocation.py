@@ -1,7 +1,13 @@
 from __future__ import annotations
 
+from collections.abc import Iterable, Mapping
 from dataclasses import dataclass
 
+from bot.state import level_bit
+
+# (level, fill-mask bit, threshold) entries in scan order.
+Ladder = Iterable[tuple[str, int, float]]
+
 
 @dataclass
 class PriceSnapshot:
@@ -23,16 +29,39 @@ def compute_deviation_pct(xaut_bid: float, xaut_ask: float, fair: float) -> floa
     return ((mid - fair) / fair) * 100
 
 
-def next_buy_level(deviation_pct: float, thresholds: dict[str, float], filled: dict[str, bool]) -> str | None:
-    for level in ("L4", "L3", "L2", "L1"):
-        if (not filled[level]) and deviation_pct <= thresholds[level]:
+def build_ladder(thresholds: Mapping[str, float]) -> tuple[tuple[str, int, float], ...]:
+    """Sort thresholds ascending, tagging each level with its fill-mask bit."""
+    return tuple(sorted(((name, level_bit(name), thr) for name, thr in thresholds.items()), key=lambda e: e[2]))
+
+
+def _ladder(thresholds: Mapping[str, float] | Ladder) -> Ladder:
+    if isinstance(thresholds, Mapping):
+        return build_ladder(thresholds)
+    return thresholds
+
+
+def _mask(filled: int | Mapping[str, bool]) -> int:
+    if isinstance(filled, int):
+        return filled
+    return sum(level_bit(name) for name, done in filled.items() if done)
+
+
+def next_buy_level(
+    deviation_pct: float, thresholds: Mapping[str, float] | Ladder, filled: int | Mapping[str, bool]
+) -> str | None:
+    mask = _mask(filled)
+    for level, bit, threshold in _ladder(thresholds):
+        if deviation_pct <= threshold and not mask & bit:
             return level
     return None
 
 
-def next_sell_step(deviation_pct: float, thresholds: dict[str, float], filled: dict[str, bool]) -> str | None:
-    for step in ("S1", "S2", "S3"):
-        if (not filled[step]) and deviation_pct >= thresholds[step]:
+def next_sell_step(
+    deviation_pct: float, thresholds: Mapping[str, float] | Ladder, filled: int | Mapping[str, bool]
+) -> str | None:
+    mask = _mask(filled)
+    for step, bit, threshold in _ladder(thresholds):
+        if deviation_pct >= threshold and not mask & bit:
             return step
     return None
 
@@ -1,22 +1,20 @@
 from __future__ import annotations
 
-from datetime import datetime
-
-from bot.state import BotState, XauHistoryPoint
+from bot.state import BotState
 
 
 def xauusd_24h_change_pct(state: BotState) -> float:
-    if len(state.xauusd_history) < 2:
-        return 0.0
-    first = state.xauusd_history[0].price
-    last = state.xauusd_history[-1].price
-    if first == 0:
+    px = state.xau_px
+    if len(px) < 2 or px[0] == 0:
         return 0.0
-    return ((last - first) / first) * 100
+    first = px[0]
+    return ((px[-1] - first) / first) * 100
 
 
-def update_xau_history(state: BotState, xauusd_price: float, now: datetime) -> None:
-    state.xauusd_history.append(XauHistoryPoint(ts=now, price=xauusd_price))
+def update_xau_history(state: BotState, xauusd_price: float, now: int) -> None:
+    """Append a price sampled at ``now`` (epoch ms) and drop points older than 24h."""
+    state.xau_ts.append(now)
+    state.xau_px.append(xauusd_price)
     state.prune_history(now)
 
 
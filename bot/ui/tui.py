@@ -1,14 +1,82 @@
 from __future__ import annotations
 
+from collections.abc import Callable, Hashable, Sequence
+from dataclasses import dataclass, field
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
+from rich.console import RenderableType
 from rich.layout import Layout
 from rich.panel import Panel
 from rich.table import Table
 from rich.text import Text
 
-from bot.state import BotState
+from bot.state import BotState, now_ms
+
+_STATE_STR = {True: "filled", False: "waiting"}
+_FMT1 = "{:.1f}".format
+_FMT2 = "{:.2f}".format
+_FMT4 = "{:.4f}".format
+_FMT6 = "{:.6f}".format
+_FMT2_PCT = "{:.2f}%".format
+_FMT4_PCT = "{:.4f}%".format
+
+
+def _fmt4(x: float | None) -> str:
+    return "N/A" if x is None else _FMT4(x)
+
+
+def _fmt4_pct(x: float | None) -> str:
+    return "N/A" if x is None else _FMT4_PCT(x)
+
+
+def _build_skeleton() -> Layout:
+    layout = Layout()
+    layout.split_column(
+        Layout(name="header", size=3),
+        Layout(name="body", ratio=1),
+        Layout(name="events", size=8),
+    )
+    layout["body"].split_row(Layout(name="left"), Layout(name="right"))
+    layout["left"].split_column(Layout(name="prices"), Layout(name="position"), Layout(name="buy_levels"))
+    layout["right"].split_column(Layout(name="sell_steps"), Layout(name="order"), Layout(name="warnings"))
+    return layout
+
+
+@dataclass
+class LayoutCache:
+    """Layout tree built once; each region is re-rendered only when its inputs change.
+
+    The timezone and loop interval are fixed for the bot's lifetime and are
+    bound here once. The header template is rebuilt only when the mode
+    changes (LIVE can fall back to DRY_RUN at runtime).
+    """
+
+    tz_name: str
+    loop_seconds: int
+    layout: Layout = field(default_factory=_build_skeleton)
+    keys: dict[str, Hashable] = field(default_factory=dict)
+    tz: ZoneInfo = field(init=False)
+    _header_mode: str | None = field(default=None, init=False)
+    _header_tmpl: str = field(default="", init=False)
+
+    def __post_init__(self) -> None:
+        self.tz = ZoneInfo(self.tz_name)
+
+    def header_template(self, mode: str) -> str:
+        if mode != self._header_mode:
+            mode_text = f"{mode} SIMULATED" if mode == "DRY_RUN" else "LIVE"
+            self._header_tmpl = (
+                f"Status: {{status}} | Mode: {mode_text} | Time: {{now}} | Loop: {self.loop_seconds}s"
+            )
+            self._header_mode = mode
+        return self._header_tmpl
+
+    def refresh(self, region: str, key: Hashable, render: Callable[[], RenderableType]) -> None:
+        if region in self.keys and self.keys[region] == key:
+            return
+        self.layout[region].update(render())
+        self.keys[region] = key
 
 
 def _levels_table(title: str, mapping: dict[str, bool]) -> Panel:
@@ -16,87 +84,107 @@ def _levels_table(title: str, mapping: dict[str, bool]) -> Panel:
     t.add_column("Level")
     t.add_column("State")
     for k, v in mapping.items():
-        t.add_row(k, "filled" if v else "waiting")
+        t.add_row(k, _STATE_STR[v])
     return Panel(t, title=title)
 
 
-def build_layout(
+def _mid(bid: float | None, ask: float | None) -> float | None:
+    if bid is None or ask is None:
+        return None
+    return (bid + ask) / 2
+
+
+def _kv_table(title: str, header: str, rows: Sequence[tuple[str, str]]) -> Panel:
+    t = Table(expand=True)
+    t.add_column(header)
+    t.add_column("Value")
+    for row in rows:
+        t.add_row(*row)
+    return Panel(t, title=title)
+
+
+def _prices_rows(
+    xauusd: float | None, bid: float | None, ask: float | None, deviation: float | None
+) -> tuple[tuple[str, str], ...]:
+    return (
+        ("XAUUSD", _fmt4(xauusd)),
+        ("XAUT bid", _fmt4(bid)),
+        ("XAUT ask", _fmt4(ask)),
+        ("XAUT mid", _fmt4(_mid(bid, ask))),
+        ("Deviation %", _fmt4_pct(deviation)),
+    )
+
+
+def _position_rows(xaut: float, usdt: float, mid: float | None) -> tuple[tuple[str, str], ...]:
+    used = 0.0
+    if mid is not None and (total := xaut * mid + usdt) > 0:
+        used = xaut * mid / total * 100
+    return (("XAUT", _FMT6(xaut)), ("USDT free", _FMT2(usdt)), ("Used capital", _FMT2_PCT(used)))
+
+
+def _order_panel(state: BotState, age: float | None) -> Panel:
+    ao = state.active_order
+    if ao is None or age is None:
+        return _kv_table("Active Order", "Field", [("active_order", "none")])
+    return _kv_table(
+        "Active Order",
+        "Field",
+        [
+            ("id", ao.order_id),
+            ("side", ao.side.value),
+            ("level", ao.level),
+            ("price", _FMT4(ao.price)),
+            ("qty", _FMT6(ao.qty)),
+            ("filled", _FMT6(ao.filled_qty)),
+            ("status", ao.status),
+            ("age(min)", _FMT1(age)),
+        ],
+    )
+
+
+def update_layout(
+    cache: LayoutCache,
     state: BotState,
     mode: str,
-    loop_seconds: int,
-    tz_name: str,
     xauusd: float | None,
     bid: float | None,
     ask: float | None,
     deviation: float | None,
     warnings: list[str],
 ) -> Layout:
-    layout = Layout()
-    layout.split_column(
-        Layout(name="header", size=3),
-        Layout(name="body", ratio=1),
-        Layout(name="events", size=8),
+    now = datetime.now(cache.tz).strftime("%Y-%m-%d %H:%M:%S")
+    emergency = state.emergency_mode.enabled
+    header = cache.header_template(mode).format(status="EMERGENCY" if emergency else "ACTIVE", now=now)
+    color = "red" if emergency else "green"
+    cache.refresh(
+        "header", (header, color), lambda: Panel(Text(header, style=color, no_wrap=True, overflow="ellipsis"))
     )
-    layout["body"].split_row(Layout(name="left"), Layout(name="right"))
 
-    now = datetime.now(ZoneInfo(tz_name)).strftime("%Y-%m-%d %H:%M:%S")
-    status = "EMERGENCY" if state.emergency_mode.enabled else "ACTIVE"
-    color = "red" if state.emergency_mode.enabled else "green"
-    mode_text = f"{mode} SIMULATED" if mode == "DRY_RUN" else "LIVE"
-    layout["header"].update(
-        Panel(Text(f"Status: {status} | Mode: {mode_text} | Time: {now} | Loop: {loop_seconds}s", style=color))
+    # Panels showing prices are keyed on their formatted rows, so moves below
+    # display precision do not rebuild the tables.
+    prices = _prices_rows(xauusd, bid, ask, deviation)
+    cache.refresh("prices", prices, lambda: _kv_table("Prices", "Metric", prices))
+
+    position = _position_rows(state.balances.xaut, state.balances.usdt, _mid(bid, ask))
+    cache.refresh("position", position, lambda: _kv_table("Position", "Position", position))
+
+    cache.refresh(
+        "buy_levels", state.filled_buy_mask, lambda: _levels_table("Buy Levels", state.filled_buy_levels)
+    )
+    cache.refresh(
+        "sell_steps", state.filled_sell_mask, lambda: _levels_table("Sell Steps", state.filled_sell_steps)
     )
 
-    p = Table(expand=True)
-    p.add_column("Metric")
-    p.add_column("Value")
-    p.add_row("XAUUSD", "N/A" if xauusd is None else f"{xauusd:.4f}")
-    p.add_row("XAUT bid", "N/A" if bid is None else f"{bid:.4f}")
-    p.add_row("XAUT ask", "N/A" if ask is None else f"{ask:.4f}")
-    mid = None if bid is None or ask is None else (bid + ask) / 2
-    p.add_row("XAUT mid", "N/A" if mid is None else f"{mid:.4f}")
-    p.add_row("Deviation %", "N/A" if deviation is None else f"{deviation:.4f}%")
-
-    pos = Table(expand=True)
-    pos.add_column("Position")
-    pos.add_column("Value")
-    xaut = state.balances.get("XAUT", 0.0)
-    usdt = state.balances.get("USDT", 0.0)
-    used = 0.0
-    if mid and (xaut * mid + usdt) > 0:
-        used = (xaut * mid) / (xaut * mid + usdt) * 100
-    pos.add_row("XAUT", f"{xaut:.6f}")
-    pos.add_row("USDT free", f"{usdt:.2f}")
-    pos.add_row("Used capital", f"{used:.2f}%")
-
-    order = Table(expand=True)
-    order.add_column("Field")
-    order.add_column("Value")
-    if state.active_order:
-        ao = state.active_order
-        age = (datetime.utcnow() - ao.created_ts.replace(tzinfo=None)).total_seconds() / 60
-        order.add_row("id", ao.order_id)
-        order.add_row("side", ao.side)
-        order.add_row("level", ao.level)
-        order.add_row("price", f"{ao.price:.4f}")
-        order.add_row("qty", f"{ao.qty:.6f}")
-        order.add_row("filled", f"{ao.filled_qty:.6f}")
-        order.add_row("status", ao.status)
-        order.add_row("age(min)", f"{age:.1f}")
-    else:
-        order.add_row("active_order", "none")
-
-    left = Layout()
-    left.split_column(Layout(Panel(p, title="Prices")), Layout(Panel(pos, title="Position")), Layout(_levels_table("Buy Levels", state.filled_buy_levels)))
-
-    right = Layout()
-    right.split_column(
-        Layout(_levels_table("Sell Steps", state.filled_sell_steps)),
-        Layout(Panel(order, title="Active Order")),
-        Layout(Panel("\n".join(warnings + ([state.emergency_mode.reason] if state.emergency_mode.reason else [])) or "None", title="Warnings")),
+    ao = state.active_order
+    age = None if ao is None else ao.age_minutes(now_ms())
+    order_key = None if ao is None else (ao.order_id, ao.status, ao.filled_qty, round(age, 1))
+    cache.refresh("order", order_key, lambda: _order_panel(state, age))
+
+    warning_lines = warnings + ([state.emergency_mode.reason] if state.emergency_mode.reason else [])
+    cache.refresh(
+        "warnings", tuple(warning_lines), lambda: Panel("\n".join(warning_lines) or "None", title="Warnings")
     )
 
-    layout["left"].update(left)
-    layout["right"].update(right)
-    layout["events"].update(Panel("\n".join(state.events[-10:]) or "No events", title="Events"))
-    return layout
+    events = state.events
+    cache.refresh("events", state.events_seq, lambda: Panel("\n".join(events) or "No events", title="Events"))
+    return cache.layout
@@ -0,0 +1,36 @@
+import pytest
+from bot.config import Settings, _decimals
+from bot.exchange.mexc import MexcPrivate, floor_to_grid
+
+
+@pytest.mark.parametrize(
+    ("increment", "expected"),
+    [(0.01, 2), (0.001, 3), (0.25, 2), (0.0025, 4), (0.5, 1), (1.0, 0), (10.0, 0), (1e-5, 5)],
+)
+def test_decimals_follow_increment_digits(increment: float, expected: int) -> None:
+    assert _decimals(increment) == expected
+
+
+def test_apply_exchange_info_rederives_precision() -> None:
+    settings = Settings()
+    settings.apply_exchange_info({"tick_size": 0.25, "step_size": 0.0025, "min_notional": 0})
+    assert (settings.tick_size, settings.step_size, settings.min_notional) == (0.25, 0.0025, 5.0)
+    assert (settings.price_decimals, settings.qty_decimals) == (2, 4)
+    assert (settings.tick_inv, settings.step_inv) == (4, 400)
+
+
+def test_order_strings_stay_on_multi_digit_grid(monkeypatch: pytest.MonkeyPatch) -> None:
+    settings = Settings(tick_size=0.25, step_size=0.0025)
+    price = floor_to_grid(10.33, settings.tick_size, settings.tick_inv)
+    qty = floor_to_grid(1.2399, settings.step_size, settings.step_inv)
+    sent: dict = {}
+
+    def fake_signed_request(method: str, path: str, params: dict) -> dict:
+        sent.update(params)
+        return {"orderId": 1}
+
+    with MexcPrivate("key", "secret") as client:
+        monkeypatch.setattr(client, "_signed_request", fake_signed_request)
+        client.place_limit_order("XAUTUSDT", "BUY", price, qty, settings.price_decimals, settings.qty_decimals)
+    assert sent["price"] == "10.25"
+    assert sent["quantity"] == "1.2375"
@@ -0,0 +1,82 @@
+from bot.state import MAX_EVENTS, BotState, StateStore, _state_from_dict, now_ms
+from bot.strategy.risk import update_xau_history, xauusd_24h_change_pct
+
+
+def test_legacy_state_layout_is_migrated_on_load() -> None:
+    state = _state_from_dict(
+        {
+            "xauusd_history": [
+                {"ts": "2026-02-09T17:55:54.705190", "price": 100.0},
+                {"ts": "2026-02-09T17:56:26.543210", "price": 101.0},
+            ],
+            "filled_buy_levels": {"L1": False, "L2": True, "L3": False, "L4": False},
+            "active_order": {
+                "order_id": "1",
+                "side": "BUY",
+                "level": "L1",
+                "price": 100.0,
+                "qty": 0.1,
+                "created_ts": "2026-02-09T17:55:54.705190",
+            },
+        }
+    )
+    assert list(state.xau_ts) == [1770659754705, 1770659786543]
+    assert state.active_order is not None
+    assert state.active_order.created_ts == 1770659754705
+    assert state.filled_buy_mask == 0b10
+    assert state.filled_buy_levels["L2"] and not state.filled_buy_levels["L1"]
+    assert xauusd_24h_change_pct(state) == 1.0
+
+
+def test_history_prunes_points_older_than_24h(tmp_path) -> None:
+    state = BotState()
+    hour_ms = 60 * 60 * 1000
+    start = now_ms() - 25 * hour_ms
+    update_xau_history(state, 100.0, start)
+    update_xau_history(state, 101.0, start + 12 * hour_ms)
+    update_xau_history(state, 102.0, start + 25 * hour_ms)
+    assert list(state.xau_px) == [101.0, 102.0]
+
+    store = StateStore(tmp_path / "state.json")
+    store.save(state)
+    loaded = store.load()
+    assert list(loaded.xau_ts) == list(state.xau_ts)
+    assert list(loaded.xau_px) == list(state.xau_px)
+
+
+def test_history_is_appended_outside_the_snapshot(tmp_path) -> None:
+    store = StateStore(tmp_path / "state.json")
+    state = BotState()
+    base = now_ms()
+    for i in range(3):
+        update_xau_history(state, 100.0 + i, base + i)
+        store.save(state)
+    store.close()
+
+    assert b"xauusd_history" not in store.path.read_bytes()
+    assert len(store.history_path.read_bytes().splitlines()) == 3
+    loaded = StateStore(store.path).load()
+    assert list(loaded.xau_px) == [100.0, 101.0, 102.0]
+
+
+def test_save_skips_write_when_state_unchanged(tmp_path) -> None:
+    store = StateStore(tmp_path / "state.json")
+    state = BotState()
+    store.save(state)
+    store.path.write_text("sentinel")
+    store.save(state)
+    assert store.path.read_text() == "sentinel"
+
+    state.add_event("changed")
+    store.save(state)
+    assert store.load().events[-1].endswith("changed")
+
+
+def test_events_seq_advances_on_repeated_event() -> None:
+    state = BotState()
+    for _ in range(MAX_EVENTS + 2):
+        state.add_event("XAUUSD unavailable")
+    before = (state.events_seq, len(state.events), state.events[-1])
+    state.add_event("XAUUSD unavailable")
+    assert state.events_seq == before[0] + 1
+    assert (len(state.events), state.events[-1]) == before[1:]
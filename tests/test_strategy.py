@@ -1,7 +1,8 @@
 import pytest
-from bot.exchange.mexc import floor_to_step, floor_to_tick
+from bot.config import LevelThresholds
+from bot.exchange.mexc import floor_to_grid, floor_to_step, floor_to_tick
 from bot.state import BotState
-from bot.strategy.dislocation import compute_deviation_pct, next_buy_level, sell_qty
+from bot.strategy.dislocation import compute_deviation_pct, next_buy_level, next_sell_step, sell_qty
 from bot.strategy.risk import update_emergency_mode
 
 
@@ -16,6 +17,17 @@ def test_next_buy_level_prefers_deepest() -> None:
     assert next_buy_level(-2.6, thresholds, filled) == "L4"
 
 
+def test_precomputed_ladders_match_mapping_scan() -> None:
+    thresholds = LevelThresholds()
+    filled_buy = {"L1": False, "L2": False, "L3": True, "L4": True}
+    filled_sell = {"S1": False, "S2": False, "S3": False}
+    assert next_buy_level(-2.6, thresholds.buy_ladder, filled_buy) == "L2"
+    assert next_buy_level(-2.6, thresholds.buy, filled_buy) == "L2"
+    assert next_sell_step(0.1, thresholds.sell_ladder, filled_sell) == "S1"
+    assert next_buy_level(-2.6, thresholds.buy_ladder, 0b1100) == "L2"
+    assert next_sell_step(0.1, thresholds.sell_ladder, 0b001) == "S2"
+
+
 def test_sell_qty_steps() -> None:
     assert sell_qty("S1", 10) == 2.5
     assert sell_qty("S2", 10) == 5.0
@@ -28,6 +40,13 @@ def test_rounding_price_qty() -> None:
     assert floor_to_step(1.239, 0.01) == pytest.approx(1.23)
 
 
+def test_floor_to_grid_is_exact_on_grid_values() -> None:
+    assert floor_to_grid(4.35, 0.01, 100) == 4.35
+    assert floor_to_grid(10.127, 0.01, 100) == 10.12
+    assert floor_to_grid(1.2399, 0.001, 1000) == 1.239
+    assert floor_to_grid(10.127, 0.3, 0) == pytest.approx(9.9)
+
+
 def test_emergency_mode_on_and_off() -> None:
     state = BotState()
     update_emergency_mode(state, deviation_pct=-5.0)
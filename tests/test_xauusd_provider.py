@@ -0,0 +1,67 @@
+import httpx
+import pytest
+from bot.data_providers.xauusd_provider import XauUsdProvider
+
+URL = "https://quotes.example/xauusd"
+
+
+def _provider(responses: list) -> tuple[XauUsdProvider, list[httpx.Request]]:
+    """Provider whose client replays ``responses`` (an httpx.Response or an exception each)."""
+    seen: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        item = responses.pop(0)
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+    provider = XauUsdProvider(URL, "key", max_stale_seconds=45.0)
+    provider.close()
+    provider._client = httpx.Client(transport=httpx.MockTransport(handler))
+    return provider, seen
+
+
+def _ok(price: float = 2000.0) -> httpx.Response:
+    return httpx.Response(200, json={"price": price, "timestamp": "t"}, headers={"ETag": '"v1"'})
+
+
+def test_not_modified_reuses_cached_quote_and_sends_etag() -> None:
+    provider, seen = _provider([_ok(), httpx.Response(304)])
+    first = provider.fetch()
+    second = provider.fetch()
+    assert first.price == 2000.0
+    assert second is first
+    assert not second.stale
+    assert "If-None-Match" not in seen[0].headers
+    assert seen[1].headers["If-None-Match"] == '"v1"'
+
+
+@pytest.mark.parametrize("failure", [httpx.Response(503), httpx.ConnectError("down")])
+def test_transient_failure_inside_window_returns_cached_quote(failure) -> None:
+    provider, _ = _provider([_ok(), failure])
+    first = provider.fetch()
+    second = provider.fetch()
+    assert second.price == first.price
+    assert second.stale and second.unavailable_reason
+    assert not first.stale
+
+
+@pytest.mark.parametrize("failure", [httpx.Response(503), httpx.ConnectError("down")])
+def test_transient_failure_outside_window_is_unavailable(failure) -> None:
+    provider, _ = _provider([_ok(), failure])
+    provider.fetch()
+    provider._last_ok -= 46.0
+    quote = provider.fetch()
+    assert quote.price is None
+    assert quote.unavailable_reason and quote.unavailable_reason.startswith("XAUUSD unavailable")
+
+
+@pytest.mark.parametrize(
+    "failure",
+    [httpx.Response(404), httpx.Response(429), httpx.Response(200, json={"nope": 1}), httpx.Response(200, text="x")],
+)
+def test_client_errors_and_bad_payloads_are_not_transient(failure) -> None:
+    provider, _ = _provider([_ok(), failure])
+    provider.fetch()
+    assert provider.fetch().price is None
@@ -1,35 +1,68 @@
-﻿import json, datetime
-from http.server import BaseHTTPRequestHandler, HTTPServer
+﻿import atexit, importlib.util, json, datetime, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 import httpx
 
+try:
+    from orjson import dumps as _dumps
+except ImportError:
+    def _dumps(obj):
+        return json.dumps(obj).encode("utf-8")
+
 STOOQ_URL = "https://stooq.com/q/l/?s=xauusd&f=sd2t2ohlcv&h&e=csv"
+CACHE_TTL = 2.0  # seconds; pollers inside this window share one upstream fetch
 
-class Handler(BaseHTTPRequestHandler):
-    def do_GET(self):
+# One keep-alive client for all upstream fetches; HTTP/2 when h2 is installed.
+_CLIENT = httpx.Client(
+    http2=importlib.util.find_spec("h2") is not None,
+    timeout=8,
+    limits=httpx.Limits(max_keepalive_connections=4),
+)
+atexit.register(_CLIENT.close)
+
+_cache_lock = threading.Lock()
+# (expires_at monotonic, HTTP status, encoded body, Content-Length); failures
+# are cached too, so pollers queued behind a failed fetch get its 502 instead
+# of each retrying the upstream in turn.
+_cache = (0.0, 200, b"", "0")
+
+
+def fetch_xauusd():
+    """Return the HTTP status, JSON response body and Content-Length, all ready to send."""
+    global _cache
+    with _cache_lock:
+        expires_at, status, body, length = _cache
+        if time.monotonic() < expires_at:
+            return status, body, length
         try:
-            r = httpx.get(STOOQ_URL, timeout=8)
+            r = _CLIENT.get(STOOQ_URL)
             r.raise_for_status()
-            lines = r.text.strip().splitlines()
-            header = lines[0].split(",")
-            row = lines[1].split(",")
-            data = dict(zip(header, row))
-            price = float(data["Close"])
-            ts = f'{data["Date"]}T{data["Time"]}Z'
-            payload = {"price": price, "timestamp": ts}
-            body = json.dumps(payload).encode("utf-8")
-            self.send_response(200)
-            self.send_header("Content-Type", "application/json")
-            self.send_header("Content-Length", str(len(body)))
-            self.end_headers()
-            self.wfile.write(body)
+            # f=sd2t2ohlcv => Symbol,Date,Time,Open,High,Low,Close,Volume; skip the header line.
+            raw = r.content
+            cols = raw[raw.index(b"\n") + 1 :].split(b",", 7)
+            price = float(cols[6])
+            ts = f"{cols[1].decode()}T{cols[2].decode()}Z"
+            status, body = 200, _dumps({"price": price, "timestamp": ts})
         except Exception as e:
-            body = json.dumps({"price": None, "timestamp": None, "error": str(e)}).encode("utf-8")
-            self.send_response(502)
-            self.send_header("Content-Type", "application/json")
-            self.send_header("Content-Length", str(len(body)))
-            self.end_headers()
-            self.wfile.write(body)
+            status, body = 502, _dumps({"price": None, "timestamp": None, "error": str(e)})
+        length = str(len(body))
+        _cache = (time.monotonic() + CACHE_TTL, status, body, length)
+        return status, body, length
+
+
+class Handler(BaseHTTPRequestHandler):
+    # Keep-alive for pollers; every response sets Content-Length.
+    protocol_version = "HTTP/1.1"
+    # Close idle keep-alive connections instead of holding a server thread.
+    timeout = 30
+
+    def do_GET(self):
+        status, body, length = fetch_xauusd()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", length)
+        self.end_headers()
+        self.wfile.write(body)
 
 if __name__ == "__main__":
-    HTTPServer(("127.0.0.1", 8787), Handler).serve_forever()
+    ThreadingHTTPServer(("127.0.0.1", 8787), Handler).serve_forever()